@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+
+WORKER_SOCKET = os.environ.get("PLAYWRIGHT_WORKER_SOCKET", "/tmp/playwright_worker.sock")
+WORKER_LOG = os.environ.get("PLAYWRIGHT_WORKER_LOG", "/opt/airflow/logs/playwright_worker.log")
+WORKER_TIMEOUT = 45 * 60
+WORKER_PING_TIMEOUT = 60
+WORKER_STARTUP_TIMEOUT = 60
+STREAM_LIMIT = 16 * 1024 * 1024
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_SOURCES = ("project.py", "playwright_worker.py")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def code_version() -> str:
+    digest = hashlib.sha1()
+    for name in WORKER_SOURCES:
+        with open(os.path.join(WORKER_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class SocketRowWriter:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+
+    def writerow(self, row: Dict):
+        self.writer.write(orjson.dumps({"row": row}) + b"\n")
+
+
+class PlaywrightWorker:
+    def __init__(self):
+        self.code_version = code_version()
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.browser_lock = asyncio.Lock()
+        self.stopping = asyncio.Event()
+
+    async def start(self):
+        from playwright.async_api import async_playwright
+
+        self.playwright = await async_playwright().start()
+        await self.ensure_browser()
+
+    async def ensure_browser(self):
+        from project import launch_browser
+
+        async with self.browser_lock:
+            if self.browser is not None and self.browser.is_connected():
+                return
+
+            if self.browser is not None:
+                logger.warning("[WORKER] Browser disconnected; relaunching")
+            await self.close_browser()
+
+            self.browser, self.context = await launch_browser(self.playwright)
+            logger.info("[WORKER] Browser launched")
+
+    async def close_browser(self):
+        for closable in (self.context, self.browser):
+            if closable is not None:
+                try:
+                    await closable.close()
+                except Exception as e:
+                    logger.debug(f"[WORKER] Error closing browser: {e}")
+        self.context = None
+        self.browser = None
+
+    async def stop(self):
+        await self.close_browser()
+        if self.playwright:
+            await self.playwright.stop()
+
+    async def scrape_list(self, params: Dict) -> List[Dict]:
+        from project import scrape_list_pages
+
+        await self.ensure_browser()
+        return await scrape_list_pages(context=self.context)
+
+    async def scrape_metadata(self, params: Dict, writer: asyncio.StreamWriter):
+        from project import scrape_all_movies_batch
+
+        await self.ensure_browser()
+        await scrape_all_movies_batch(params["movies"], SocketRowWriter(writer), context=self.context)
+
+        if not self.browser.is_connected():
+            raise RuntimeError("Browser disconnected during scrape_metadata")
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        method = None
+        try:
+            line = await reader.readline()
+            request = orjson.loads(line)
+            method = request.get("method")
+            params = request.get("params", {})
+            logger.info(f"[WORKER] Received {method}")
+
+            if method == "ping":
+                await self.ensure_browser()
+                response = {"result": {"status": "pong", "code_version": self.code_version}}
+            elif method == "shutdown":
+                response = {"result": "stopping"}
+            elif method == "scrape_list":
+                response = {"result": await self.scrape_list(params)}
+            elif method == "scrape_metadata":
+                await self.scrape_metadata(params, writer)
+                response = {"result": "done"}
+            else:
+                response = {"error": f"Unknown method: {method}"}
+
+        except Exception as e:
+            logger.error(f"[WORKER] Request failed: {e}")
+            response = {"error": str(e)}
+
+        try:
+            writer.write(orjson.dumps(response) + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+            if method == "shutdown":
+                logger.info("[WORKER] Shutting down")
+                self.stopping.set()
+
+    async def serve(self):
+        if os.path.exists(WORKER_SOCKET):
+            os.remove(WORKER_SOCKET)
+
+        await self.start()
+        old_umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self.handle_client, path=WORKER_SOCKET, limit=STREAM_LIMIT)
+        finally:
+            os.umask(old_umask)
+        os.chmod(WORKER_SOCKET, 0o600)
+        logger.info(f"[WORKER] Listening on {WORKER_SOCKET} (code version {self.code_version[:12]})")
+
+        try:
+            async with server:
+                await self.stopping.wait()
+        finally:
+            await self.stop()
+
+
+def stream_worker(method: str, params: Optional[Dict] = None,
+                  timeout: float = WORKER_TIMEOUT) -> Iterator[Dict]:
+    payload = orjson.dumps({"method": method, "params": params or {}}) + b"\n"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(WORKER_SOCKET)
+        sock.sendall(payload)
+        with sock.makefile("rb") as f:
+            for line in f:
+                message = orjson.loads(line)
+                if "row" in message:
+                    yield message["row"]
+                elif "error" in message:
+                    raise RuntimeError(f"Playwright worker error: {message['error']}")
+                else:
+                    return
+
+    raise RuntimeError("Playwright worker closed the connection without a result")
+
+
+def call_worker(method: str, params: Optional[Dict] = None, timeout: float = WORKER_TIMEOUT) -> Any:
+    payload = orjson.dumps({"method": method, "params": params or {}}) + b"\n"
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(WORKER_SOCKET)
+        sock.sendall(payload)
+        with sock.makefile("rb") as f:
+            line = f.readline()
+
+    response = orjson.loads(line)
+    if "error" in response:
+        raise RuntimeError(f"Playwright worker error: {response['error']}")
+    return response["result"]
+
+
+def worker_status() -> Optional[Dict]:
+    if not os.path.exists(WORKER_SOCKET):
+        return None
+    try:
+        return call_worker("ping", timeout=WORKER_PING_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"[WORKER] Ping failed: {e}")
+        return None
+
+
+def worker_available() -> bool:
+    status = worker_status()
+    if not status:
+        return False
+
+    if status.get("code_version") != code_version():
+        logger.warning("[WORKER] Running worker has stale DAG code; not using it")
+        return False
+
+    return True
+
+
+def stop_worker():
+    try:
+        call_worker("shutdown", timeout=WORKER_PING_TIMEOUT)
+    except Exception as e:
+        logger.debug(f"[WORKER] Shutdown request failed: {e}")
+
+
+def ensure_worker():
+    status = worker_status()
+    if status and status.get("code_version") == code_version():
+        logger.info(f"[WORKER] Already running on {WORKER_SOCKET}")
+        return
+
+    if status:
+        logger.info("[WORKER] DAG code changed since the worker started; restarting it")
+    if os.path.exists(WORKER_SOCKET):
+        stop_worker()
+
+    logger.info("[WORKER] Starting Playwright worker")
+    with open(WORKER_LOG, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            cwd=WORKER_DIR,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + WORKER_STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if worker_available():
+            logger.info(f"[WORKER] Ready on {WORKER_SOCKET}")
+            return
+        time.sleep(1)
+
+    logger.warning(f"[WORKER] Not ready after {WORKER_STARTUP_TIMEOUT}s; "
+                   f"tasks will scrape in-process (see {WORKER_LOG})")
+
+
+if __name__ == "__main__":
+    if "--ensure" in sys.argv:
+        ensure_worker()
+    else:
+        import uvloop
+
+        uvloop.run(PlaywrightWorker().serve())
\ No newline at end of file
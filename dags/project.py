@@ -2,25 +2,173 @@ import asyncio
 import csv
 import sqlite3
 import logging
+import os
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
-import nest_asyncio
+import httpx
+import orjson
+import uvloop
+import xxhash
 from airflow import DAG
+from airflow.exceptions import AirflowException
+from airflow.operators.bash import BashOperator
 from airflow.operators.python import PythonOperator
-from playwright.async_api import async_playwright
+from playwright.async_api import Browser, BrowserContext, async_playwright
+from selectolax.parser import HTMLParser
 
-nest_asyncio.apply()
+from playwright_worker import call_worker, stream_worker, worker_available
 
 
 BASE_URL = "https://www.rottentomatoes.com/browse/movies_at_home/?page="
 PAGES = list(range(0, 8))
+MIN_LINKS_PER_PAGE = 10
+MAX_CONCURRENT = int(os.environ.get("SCRAPER_MAX_CONCURRENT", "10"))
+SCRAPE_CACHE_MAX_AGE = timedelta(days=int(os.environ.get("SCRAPE_CACHE_MAX_AGE_DAYS", "7")))
+
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
 
 RAW_OUTPUT = "/opt/airflow/data/movies_raw.csv"
 CLEAN_OUTPUT = "/opt/airflow/data/movies_clean.csv"
 DB_PATH = "/opt/airflow/data/movies.db"
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "playwright_worker.py")
+
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-translate",
+    "--disable-features=IsolateOrigins,site-per-process,TranslateUI,BlinkGenPropertyTrees",
+    "--blink-settings=imagesEnabled=false",
+]
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+BLOCKED_DOMAINS = (
+    "doubleclick.net",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "adservice.google.com",
+    "scorecardresearch.com",
+    "facebook.net",
+    "amazon-adsystem.com",
+    "quantserve.com",
+    "chartbeat.com",
+)
+
+WS_RE = re.compile(r'\s+')
+PUNCT_RE = re.compile(r'[^\w\s]')
+SCORE_RE = re.compile(r'(\d{1,3})')
+SCORE_ONLY_RE = re.compile(r'^(\d{1,3})%?$')
+WIDE_RE = re.compile(r'\s*,\s*Wide$')
+DIGITS_RE = re.compile(r'(\d+)')
+TRAILING_ARTICLE_RE = re.compile(r'^(.+?),\s*(the|a|an)$', re.IGNORECASE)
+
+FIELD_MAPPINGS = MappingProxyType({
+    'genre': ('genre',),
+    'rating': ('rating',),
+    'runtime': ('runtime',),
+    'release date': ('release date',),
+    'director': ('director',),
+    'original language': ('original language',),
+    'box office': ('box office',),
+    'distributor': ('distributor',),
+})
+
+LIST_LINKS_JS = """() => {
+    let links = document.querySelectorAll("a[href*='/m/']:has(span.p--small)");
+    if (links.length === 0) {
+        links = document.querySelectorAll("[data-qa='discovery-media-list'] a[href*='/m/']");
+    }
+    return Array.from(links)
+        .filter((a) => a.querySelector('span.p--small'))
+        .map((a) => ({
+            href: a.getAttribute('href'),
+            title: a.querySelector('span.p--small').textContent.trim(),
+        }));
+}"""
+
+METADATA_JS = """() => {
+    const text = (el) => (el && el.textContent ? el.textContent.trim() : null);
+    const data = {
+        tomatometer: text(document.querySelector('rt-text[slot="criticsScore"]')),
+        audience: text(document.querySelector('rt-text[slot="audienceScore"]')),
+        rt_texts: Array.from(document.querySelectorAll('rt-text')).map(text).filter(Boolean),
+        items: [],
+    };
+    document.querySelectorAll('section.media-info [data-qa="item"]').forEach((item) => {
+        const label = text(item.querySelector('[data-qa="item-label"]'));
+        if (!label) return;
+        const values = Array.from(item.querySelectorAll('[data-qa="item-value"]'))
+            .map(text)
+            .filter(Boolean);
+        data.items.push({ label, values });
+    });
+    return data;
+}"""
+
+MOVIE_COLUMNS = [
+    'title', 'url', 'tomatometer_score', 'audience_score',
+    'genre', 'rating', 'duration', 'release_date', 'director',
+    'original_language', 'box_office', 'distributor'
+]
+
+MOVIE_INTEGER_COLUMNS = {'tomatometer_score', 'audience_score'}
+
+SQLITE_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=OFF;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+"""
+
+CREATE_MOVIES_TABLE = """
+CREATE TABLE movies (
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tomatometer_score INTEGER CHECK(tomatometer_score BETWEEN 0 AND 100),
+    audience_score INTEGER CHECK(audience_score BETWEEN 0 AND 100),
+    genre TEXT,
+    rating TEXT,
+    duration TEXT,
+    release_date TEXT,
+    director TEXT,
+    original_language TEXT,
+    box_office TEXT,
+    distributor TEXT
+)
+"""
+
+CREATE_SCRAPE_CACHE_TABLE = """
+CREATE TABLE IF NOT EXISTS scrape_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    scraped_at TEXT NOT NULL,
+    payload_json TEXT NOT NULL
+)
+"""
+
+MOVIE_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_url ON movies(url)",
+    "CREATE INDEX IF NOT EXISTS idx_tomatometer ON movies(tomatometer_score)",
+    "CREATE INDEX IF NOT EXISTS idx_audience ON movies(audience_score)",
+    "CREATE INDEX IF NOT EXISTS idx_genre ON movies(genre)",
+    "CREATE INDEX IF NOT EXISTS idx_rating ON movies(rating)",
+]
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,19 +178,33 @@ def normalize_url(url: str) -> str:
     if not url or not isinstance(url, str):
         return ""
     
-    if not url.startswith(('http://', 'https://')):
-        if url.startswith('//'):
-            url = 'https:' + url
-        elif url.startswith('/'):
-            url = 'https://www.rottentomatoes.com' + url
+    if url.startswith('//'):
+        url = 'https:' + url
+    elif url.startswith('/'):
+        url = 'https://www.rottentomatoes.com' + url
+    elif not url.startswith(('http://', 'https://')):
+        try:
+            parsed = urlparse(url)
+            normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+            return normalized.rstrip('/')
+        except:
+            pass
     
-    try:
-        parsed = urlparse(url)
-        normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-        return normalized.rstrip('/')
-    except:
-        url = url.split('?')[0].split('#')[0]
-        return url.rstrip('/')
+    return url.split('?', 1)[0].split('#', 1)[0].rstrip('/')
+
+
+async def block_unneeded_requests(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+        return
+    
+    host = urlparse(request.url).netloc
+    if any(host == domain or host.endswith("." + domain) for domain in BLOCKED_DOMAINS):
+        await route.abort()
+        return
+    
+    await route.continue_()
 
 
 def normalize_title(title: str) -> str:
@@ -50,94 +212,159 @@ def normalize_title(title: str) -> str:
         return ""
     
     title = title.lower().strip()
-    title = re.sub(r'\s+', ' ', title)
-    title = re.sub(r'[^\w\s]', '', title)
+    title = WS_RE.sub(' ', title)
+    title = PUNCT_RE.sub('', title)
     
     return title
 
 
-async def scrape_list_pages():
-    movies_dict = {}
-    logger.info("[LIST] Starting pagination scrape with deduplication…")
+def title_key(title: str) -> int:
+    match = TRAILING_ARTICLE_RE.match(title.strip())
+    if match:
+        title = f"{match.group(2)} {match.group(1)}"
+    
+    return xxhash.xxh3_64_intdigest(normalize_title(title).encode("utf-8"))
+
+
+def add_unique_movie(movies_dict: Dict, seen_hashes: set, title: str, href: str) -> None:
+    if not title or title.strip() == "":
+        return
+    
+    title = title.strip()
+    
+    if title.lower() in ['tomatometer', 'audience score', 'popcornmeter', 'score']:
+        return
+    
+    if not href:
+        return
+    
+    normalized_url = normalize_url(href)
+    normalized_title = normalize_title(title)
+    
+    if not normalized_url or not normalized_title:
+        return
+    
+    if normalized_url in movies_dict:
+        logger.debug(f"[LIST] Duplicate skipped (URL): {title}")
+        return
+    
+    title_hash = title_key(title)
+    if title_hash in seen_hashes:
+        logger.debug(f"[LIST] Duplicate skipped (title): {title}")
+        return
+    
+    movies_dict[normalized_url] = {
+        "title": title,
+        "url": normalized_url
+    }
+    seen_hashes.add(title_hash)
+
+
+def parse_list_html(html: str) -> List[tuple]:
+    links = []
+    
+    for node in HTMLParser(html).css("a[href*='/m/']"):
+        title_elem = node.css_first("span.p--small")
+        if title_elem is None:
+            continue
+        links.append((title_elem.text(), node.attributes.get("href")))
+    
+    return links
+
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=["--no-sandbox", "--disable-dev-shm-usage"],
+async def fetch_list_pages_http() -> Dict[int, List[tuple]]:
+    async with httpx.AsyncClient(
+        http2=True,
+        headers=HTTP_HEADERS,
+        follow_redirects=True,
+        timeout=30,
+    ) as client:
+        responses = await asyncio.gather(
+            *[client.get(BASE_URL + str(page_num)) for page_num in PAGES],
+            return_exceptions=True,
         )
-        context = await browser.new_context()
+    
+    page_links = {}
+    for page_num, response in zip(PAGES, responses):
+        if isinstance(response, Exception):
+            logger.warning(f"[LIST] HTTP fetch failed for page {page_num}: {response}")
+            page_links[page_num] = []
+            continue
+        
+        if response.status_code != 200:
+            logger.warning(f"[LIST] HTTP {response.status_code} for page {page_num}")
+            page_links[page_num] = []
+            continue
+        
+        page_links[page_num] = parse_list_html(response.text)
+        logger.info(f"[LIST] Page {page_num}: Found {len(page_links[page_num])} movie links (HTTP)")
+    
+    return page_links
 
-        for page_num in PAGES:
-            url = BASE_URL + str(page_num)
-            logger.info(f"[LIST] Scraping page {page_num}: {url}")
 
-            page = await context.new_page()
-            
-            try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                await asyncio.sleep(1)
-                
-                movie_links = page.locator("a[href*='/m/']:has(span.p--small)")
-                count = await movie_links.count()
-                
-                if count == 0:
-                    movie_links = page.locator("[data-qa='discovery-media-list'] a[href*='/m/']")
-                    count = await movie_links.count()
+async def scrape_list_page_playwright(context: BrowserContext, page_num: int) -> List[tuple]:
+    url = BASE_URL + str(page_num)
+    logger.info(f"[LIST] Scraping page {page_num} with Playwright: {url}")
+    
+    links = []
+    page = await context.new_page()
+    
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        await asyncio.sleep(1)
+        
+        items = await page.evaluate(LIST_LINKS_JS)
+        logger.info(f"[LIST] Page {page_num}: Found {len(items)} movie links")
+        
+        links = [(item["title"], item["href"]) for item in items]
+        
+    except Exception as e:
+        logger.error(f"[LIST] Error loading page {page_num}: {e}")
+    finally:
+        await page.close()
+    
+    return links
+
+
+async def launch_browser(playwright) -> Tuple[Browser, BrowserContext]:
+    browser = await playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+    context = await browser.new_context(
+        viewport={"width": 1280, "height": 800},
+        java_script_enabled=True,
+        bypass_csp=True,
+        ignore_https_errors=True,
+    )
+    await context.route("**/*", block_unneeded_requests)
+    return browser, context
+
+
+async def scrape_list_pages(context: Optional[BrowserContext] = None):
+    movies_dict = {}
+    seen_hashes = set()
+    logger.info("[LIST] Starting pagination scrape with deduplication…")
+    
+    page_links = await fetch_list_pages_http()
+    
+    fallback_pages = [n for n in PAGES if len(page_links.get(n, [])) < MIN_LINKS_PER_PAGE]
+    if fallback_pages:
+        logger.info(f"[LIST] Falling back to Playwright for pages: {fallback_pages}")
+        
+        if context is not None:
+            for page_num in fallback_pages:
+                page_links[page_num] = await scrape_list_page_playwright(context, page_num)
+        else:
+            async with async_playwright() as p:
+                browser, context = await launch_browser(p)
                 
-                logger.info(f"[LIST] Page {page_num}: Found {count} movie links")
+                for page_num in fallback_pages:
+                    page_links[page_num] = await scrape_list_page_playwright(context, page_num)
                 
-                for i in range(count):
-                    try:
-                        link = movie_links.nth(i)
-                        
-                        title_elem = link.locator("span.p--small")
-                        if await title_elem.count() == 0:
-                            continue
-                        
-                        title = await title_elem.inner_text()
-                        if not title or title.strip() == "":
-                            continue
-                        
-                        title = title.strip()
-                        
-                        if title.lower() in ['tomatometer', 'audience score', 'popcornmeter', 'score']:
-                            continue
-                        
-                        href = await link.get_attribute("href")
-                        if not href:
-                            continue
-                        
-                        normalized_url = normalize_url(href)
-                        normalized_title = normalize_title(title)
-                        
-                        if not normalized_url or not normalized_title:
-                            continue
-                        
-                        if normalized_url in movies_dict:
-                            logger.debug(f"[LIST] Duplicate skipped (URL): {title}")
-                            continue
-                        
-                        existing_titles = {normalize_title(m['title']) for m in movies_dict.values()}
-                        if normalized_title in existing_titles:
-                            logger.debug(f"[LIST] Duplicate skipped (title): {title}")
-                            continue
-                        
-                        movies_dict[normalized_url] = {
-                            "title": title,
-                            "url": normalized_url
-                        }
-                        
-                    except Exception as e:
-                        logger.debug(f"[LIST] Error processing link {i} on page {page_num}: {e}")
-                        continue
-                        
-            except Exception as e:
-                logger.error(f"[LIST] Error loading page {page_num}: {e}")
-            finally:
-                await page.close()
-        
-        await context.close()
-        await browser.close()
+                await context.close()
+                await browser.close()
+    
+    for page_num in PAGES:
+        for title, href in page_links.get(page_num, []):
+            add_unique_movie(movies_dict, seen_hashes, title, href)
     
     unique_movies = list(movies_dict.values())
     
@@ -151,302 +378,349 @@ async def scrape_list_pages():
     return unique_movies
 
 
-async def scrape_movie_metadata_efficient(url: str, title: str = "") -> Dict:
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=["--no-sandbox", "--disable-dev-shm-usage"]
-        )
-        page = await browser.new_page()
+async def scrape_movie_metadata_efficient(context: BrowserContext, url: str, title: str = "") -> Dict:
+    page = await context.new_page()
+    
+    try:
+        logger.info(f"[METADATA] Scraping: {title}")
+        
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        
+        metadata = {
+            "url": url,
+            "title": title,
+            "tomatometer_score": None,
+            "audience_score": None,
+            "genre": None,
+            "rating": None,
+            "duration": None,
+            "release_date": None,
+            "director": None,
+            "original_language": None,
+            "box_office": None,
+            "distributor": None,
+            "error": None
+        }
         
         try:
-            logger.info(f"[METADATA] Scraping: {title}")
-            
-            await page.set_viewport_size({"width": 1280, "height": 800})
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(2)
-            
-            metadata = {
-                "url": url,
-                "title": title,
-                "tomatometer_score": None,
-                "audience_score": None,
-                "genre": None,
-                "rating": None,
-                "duration": None,
-                "release_date": None,
-                "director": None,
-                "original_language": None,
-                "box_office": None,
-                "distributor": None,
-                "error": None
-            }
+            await page.wait_for_selector('rt-text[slot="criticsScore"]', state='attached', timeout=8000)
+        except:
+            logger.debug(f"[METADATA] criticsScore not found for {title}")
+        
+        data = await page.evaluate(METADATA_JS)
+        
+        for score_field, raw_key in [('tomatometer_score', 'tomatometer'), ('audience_score', 'audience')]:
+            raw_text = data.get(raw_key)
+            if raw_text:
+                logger.debug(f"[METADATA] {raw_key} raw: '{raw_text}'")
+                match = SCORE_RE.search(raw_text)
+                if match:
+                    metadata[score_field] = int(match.group(1))
+        
+        if metadata["tomatometer_score"] is None or metadata["audience_score"] is None:
+            potential_scores = []
+            for text in data.get('rt_texts', []):
+                match = SCORE_ONLY_RE.search(text)
+                if match:
+                    score = int(match.group(1))
+                    if 0 <= score <= 100:
+                        potential_scores.append(score)
             
-            try:
-                await page.wait_for_selector('media-scorecard', timeout=10000)
-            except:
-                logger.debug(f"[METADATA] media-scorecard not found for {title}")
+            if len(potential_scores) == 2:
+                potential_scores.sort(reverse=True)
+                if metadata["tomatometer_score"] is None:
+                    metadata["tomatometer_score"] = potential_scores[0]
+                if metadata["audience_score"] is None:
+                    metadata["audience_score"] = potential_scores[1]
+        
+        for item in data.get('items', []):
+            label_lower = item['label'].lower().strip()
             
-            try:
-                critics_elem = await page.wait_for_selector('rt-text[slot="criticsScore"]', timeout=5000)
-                if critics_elem:
-                    critics_text = await critics_elem.text_content()
-                    if critics_text:
-                        critics_text = critics_text.strip()
-                        logger.debug(f"[METADATA] Tomatometer raw: '{critics_text}'")
-                        match = re.search(r'(\d{1,3})', critics_text)
-                        if match:
-                            score = int(match.group(1))
-                            if 0 <= score <= 100:
-                                metadata["tomatometer_score"] = score
-            except Exception as e:
-                logger.debug(f"[METADATA] Tomatometer extraction failed: {e}")
+            target_field = None
+            for field, keywords in FIELD_MAPPINGS.items():
+                if any(keyword in label_lower for keyword in keywords):
+                    target_field = field
+                    break
             
-            try:
-                audience_elem = await page.wait_for_selector('rt-text[slot="audienceScore"]', timeout=5000)
-                if audience_elem:
-                    audience_text = await audience_elem.text_content()
-                    if audience_text:
-                        audience_text = audience_text.strip()
-                        logger.debug(f"[METADATA] Audience raw: '{audience_text}'")
-                        match = re.search(r'(\d{1,3})', audience_text)
-                        if match:
-                            score = int(match.group(1))
-                            if 0 <= score <= 100:
-                                metadata["audience_score"] = score
-            except Exception as e:
-                logger.debug(f"[METADATA] Audience extraction failed: {e}")
+            if not target_field:
+                continue
             
-            if metadata["tomatometer_score"] is None or metadata["audience_score"] is None:
-                try:
-                    scores = await page.evaluate('''() => {
-                        const scores = {};
-                        const criticsElem = document.querySelector('rt-text[slot="criticsScore"]');
-                        if (criticsElem) {
-                            const text = criticsElem.textContent.trim();
-                            const match = text.match(/(\d{1,3})/);
-                            if (match) scores.tomatometer = parseInt(match[1], 10);
-                        }
-                        const audienceElem = document.querySelector('rt-text[slot="audienceScore"]');
-                        if (audienceElem) {
-                            const text = audienceElem.textContent.trim();
-                            const match = text.match(/(\d{1,3})/);
-                            if (match) scores.audience = parseInt(match[1], 10);
-                        }
-                        return scores;
-                    }''')
-                    
-                    if scores.get('tomatometer') and metadata["tomatometer_score"] is None:
-                        metadata["tomatometer_score"] = scores['tomatometer']
-                    if scores.get('audience') and metadata["audience_score"] is None:
-                        metadata["audience_score"] = scores['audience']
-                        
-                except Exception as e:
-                    logger.debug(f"[METADATA] JavaScript extraction failed: {e}")
+            values = [WS_RE.sub(' ', v).strip() for v in item['values']]
+            values = [v for v in values if v]
             
-            if metadata["tomatometer_score"] is None or metadata["audience_score"] is None:
+            if values:
+                if target_field == 'genre':
+                    metadata["genre"] = ', '.join(values)
+                elif target_field == 'rating':
+                    metadata["rating"] = values[0]
+                elif target_field == 'runtime':
+                    metadata["duration"] = values[0].replace(' ', '')
+                elif target_field == 'release date':
+                    date_text = values[0]
+                    metadata["release_date"] = WIDE_RE.sub('', date_text)
+                elif target_field == 'director':
+                    metadata["director"] = ', '.join(values)
+                elif target_field == 'original language':
+                    metadata["original_language"] = values[0]
+                elif target_field == 'box office':
+                    metadata["box_office"] = values[0]
+                elif target_field == 'distributor':
+                    metadata["distributor"] = values[0]
+        
+        for score_field in ['tomatometer_score', 'audience_score']:
+            score = metadata.get(score_field)
+            if score is not None:
                 try:
-                    rt_texts = await page.query_selector_all('rt-text')
-                    potential_scores = []
-                    
-                    for rt_text in rt_texts:
-                        text = await rt_text.text_content()
-                        if text:
-                            text = text.strip()
-                            match = re.search(r'^(\d{1,3})%?$', text)
-                            if match:
-                                score = int(match.group(1))
-                                if 0 <= score <= 100:
-                                    potential_scores.append(score)
-                    
-                    if len(potential_scores) == 2:
-                        potential_scores.sort(reverse=True)
-                        if metadata["tomatometer_score"] is None:
-                            metadata["tomatometer_score"] = potential_scores[0]
-                        if metadata["audience_score"] is None:
-                            metadata["audience_score"] = potential_scores[1]
-                            
-                except Exception as e:
-                    logger.debug(f"[METADATA] Fallback extraction failed: {e}")
-            
-            try:
-                info_section = page.locator('section.media-info')
-                
-                if await info_section.count() > 0:
-                    field_mappings = {
-                        'genre': ['genre'],
-                        'rating': ['rating'],
-                        'runtime': ['runtime'],
-                        'release date': ['release date'],
-                        'director': ['director'],
-                        'original language': ['original language'],
-                        'box office': ['box office'],
-                        'distributor': ['distributor']
-                    }
-                    
-                    items = info_section.locator('[data-qa="item"]')
-                    
-                    for i in range(await items.count()):
-                        try:
-                            item = items.nth(i)
-                            label_elem = item.locator('[data-qa="item-label"]')
-                            
-                            if await label_elem.count() > 0:
-                                label_text = await label_elem.first.inner_text()
-                                label_lower = label_text.lower().strip()
-                                
-                                target_field = None
-                                for field, keywords in field_mappings.items():
-                                    if any(keyword in label_lower for keyword in keywords):
-                                        target_field = field
-                                        break
-                                
-                                if target_field:
-                                    value_elems = item.locator('[data-qa="item-value"]')
-                                    values = []
-                                    
-                                    for j in range(await value_elems.count()):
-                                        value_text = await value_elems.nth(j).inner_text()
-                                        if value_text and value_text.strip():
-                                            values.append(value_text.strip())
-                                    
-                                    if values:
-                                        if target_field == 'genre':
-                                            metadata["genre"] = ', '.join(values)
-                                        elif target_field == 'rating':
-                                            metadata["rating"] = values[0]
-                                        elif target_field == 'runtime':
-                                            metadata["duration"] = values[0].replace(' ', '')
-                                        elif target_field == 'release date':
-                                            date_text = values[0]
-                                            metadata["release_date"] = re.sub(r'\s*,\s*Wide$', '', date_text)
-                                        elif target_field == 'director':
-                                            metadata["director"] = ', '.join(values)
-                                        elif target_field == 'original language':
-                                            metadata["original_language"] = values[0]
-                                        elif target_field == 'box office':
-                                            metadata["box_office"] = values[0]
-                                        elif target_field == 'distributor':
-                                            metadata["distributor"] = values[0]
-                        
-                        except Exception as e:
-                            logger.debug(f"[METADATA] Error processing item {i}: {e}")
-                            continue
-                            
-            except Exception as e:
-                logger.debug(f"[METADATA] Info section error for {title}: {e}")
-            
-            for score_field in ['tomatometer_score', 'audience_score']:
-                score = metadata.get(score_field)
-                if score is not None:
-                    try:
-                        score_int = int(score)
-                        if not (0 <= score_int <= 100):
-                            metadata[score_field] = None
-                    except (ValueError, TypeError):
+                    score_int = int(score)
+                    if not (0 <= score_int <= 100):
                         metadata[score_field] = None
-            
-            if metadata["duration"]:
-                if not ('h' in metadata["duration"].lower() or 'm' in metadata["duration"].lower()):
-                    match = re.search(r'(\d+)', metadata["duration"])
-                    if match:
-                        minutes = int(match.group(1))
-                        if minutes >= 60:
-                            hours = minutes // 60
-                            mins = minutes % 60
-                            metadata["duration"] = f"{hours}h {mins}m"
-                        else:
-                            metadata["duration"] = f"{minutes}m"
-            
-            scores_found = (metadata["tomatometer_score"] is not None or 
-                          metadata["audience_score"] is not None)
-            
-            if scores_found:
-                logger.info(f"[METADATA] {title}: "
-                           f"T={metadata['tomatometer_score'] or 'N/A'}, "
-                           f"A={metadata['audience_score'] or 'N/A'}")
-            
-            await browser.close()
-            return metadata
-            
-        except Exception as e:
-            logger.error(f"[METADATA] Error scraping {url}: {str(e)}")
-            await browser.close()
-            return {
-                "url": url,
-                "title": title,
-                "error": str(e)
-            }
+                except (ValueError, TypeError):
+                    metadata[score_field] = None
+        
+        if metadata["duration"]:
+            if not ('h' in metadata["duration"].lower() or 'm' in metadata["duration"].lower()):
+                match = DIGITS_RE.search(metadata["duration"])
+                if match:
+                    minutes = int(match.group(1))
+                    if minutes >= 60:
+                        hours = minutes // 60
+                        mins = minutes % 60
+                        metadata["duration"] = f"{hours}h {mins}m"
+                    else:
+                        metadata["duration"] = f"{minutes}m"
+        
+        scores_found = (metadata["tomatometer_score"] is not None or 
+                      metadata["audience_score"] is not None)
+        
+        if scores_found:
+            logger.info(f"[METADATA] {title}: "
+                       f"T={metadata['tomatometer_score'] or 'N/A'}, "
+                       f"A={metadata['audience_score'] or 'N/A'}")
+        
+        return metadata
+        
+    except Exception as e:
+        logger.error(f"[METADATA] Error scraping {url}: {str(e)}")
+        return {
+            "url": url,
+            "title": title,
+            "error": str(e)
+        }
+    finally:
+        await page.close()
 
 
-async def scrape_all_movies_batch(movies: List[Dict], max_concurrent: int = 3) -> List[Dict]:
-    logger.info(f"[BATCH] Starting batch scrape for {len(movies)} unique movies")
+def load_scrape_cache(db_path: str = DB_PATH) -> Dict[str, Dict]:
+    cutoff = (datetime.now() - SCRAPE_CACHE_MAX_AGE).isoformat()
     
-    semaphore = asyncio.Semaphore(max_concurrent)
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(CREATE_SCRAPE_CACHE_TABLE)
+        rows = conn.execute(
+            "SELECT url, etag, last_modified, payload_json FROM scrape_cache WHERE scraped_at >= ?",
+            (cutoff,),
+        ).fetchall()
+    finally:
+        conn.close()
+    
+    return {
+        url: {"etag": etag, "last_modified": last_modified, "payload": orjson.loads(payload_json)}
+        for url, etag, last_modified, payload_json in rows
+    }
+
+
+def is_cacheable(result: Dict) -> bool:
+    return not result.get("error") and (
+        result.get("tomatometer_score") is not None or result.get("audience_score") is not None
+    )
+
+
+def save_scrape_cache(entries: List[tuple], db_path: str = DB_PATH) -> None:
+    if not entries:
+        return
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(CREATE_SCRAPE_CACHE_TABLE)
+            conn.executemany(
+                "INSERT OR REPLACE INTO scrape_cache (url, etag, last_modified, scraped_at, payload_json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                entries,
+            )
+    finally:
+        conn.close()
+
+
+async def check_page_unchanged(http_client: httpx.AsyncClient, url: str,
+                               cached: Optional[Dict]) -> Tuple[bool, Optional[str], Optional[str]]:
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+    
+    try:
+        response = await http_client.head(url, headers=headers)
+    except Exception as e:
+        logger.debug(f"[CACHE] HEAD failed for {url}: {e}")
+        return False, None, None
+    
+    if cached and response.status_code == 304:
+        return True, cached["etag"], cached["last_modified"]
     
-    async def process_movie_with_semaphore(movie):
+    if response.status_code != 200:
+        logger.debug(f"[CACHE] HEAD returned {response.status_code} for {url}")
+        return False, None, None
+    
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    
+    if not cached:
+        return False, etag, last_modified
+    
+    unchanged = bool(etag and etag == cached["etag"])
+    return unchanged, etag, last_modified
+
+
+async def scrape_all_movies_batch(movies: List[Dict], writer: csv.DictWriter,
+                                  max_concurrent: int = MAX_CONCURRENT,
+                                  context: Optional[BrowserContext] = None) -> Dict[str, int]:
+    logger.info(f"[BATCH] Starting batch scrape for {len(movies)} unique movies "
+               f"(max_concurrent={max_concurrent})")
+    
+    semaphore = asyncio.Semaphore(max_concurrent)
+    write_lock = asyncio.Lock()
+    filled_counts = {col: 0 for col in MOVIE_COLUMNS}
+    
+    cache = load_scrape_cache()
+    new_cache_entries = []
+    cache_hits = 0
+    
+    async def write_result(result):
+        async with write_lock:
+            writer.writerow(result)
+            for col in MOVIE_COLUMNS:
+                if result.get(col) is not None:
+                    filled_counts[col] += 1
+    
+    async def process_movie_with_semaphore(context, http_client, movie):
+        nonlocal cache_hits
+        
         async with semaphore:
             try:
-                result = await scrape_movie_metadata_efficient(movie["url"], movie["title"])
-                return result
+                cached = cache.get(movie["url"])
+                unchanged, etag, last_modified = await check_page_unchanged(http_client, movie["url"], cached)
+                
+                if unchanged:
+                    logger.info(f"[CACHE] Unchanged, reusing cached metadata: {movie['title']}")
+                    cache_hits += 1
+                    result = dict(cached["payload"], title=movie["title"])
+                else:
+                    result = await scrape_movie_metadata_efficient(context, movie["url"], movie["title"])
+                    if is_cacheable(result) and (etag or last_modified):
+                        new_cache_entries.append((
+                            movie["url"], etag, last_modified,
+                            datetime.now().isoformat(), orjson.dumps(result).decode("utf-8"),
+                        ))
             except Exception as e:
                 logger.error(f"[BATCH] Error processing {movie['title']}: {e}")
-                return {
+                result = {
                     "url": movie["url"],
                     "title": movie["title"],
                     "error": str(e)
                 }
+            await write_result(result)
+    
+    async def process_all(context):
+        async with httpx.AsyncClient(
+            http2=True,
+            headers=HTTP_HEADERS,
+            follow_redirects=True,
+            timeout=15,
+        ) as http_client:
+            tasks = [process_movie_with_semaphore(context, http_client, movie) for movie in movies]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for movie, result in zip(movies, results):
+            if isinstance(result, Exception):
+                logger.error(f"[BATCH] Gather error for '{movie['title']}': {result}")
+                await write_result({
+                    "url": movie["url"],
+                    "title": movie["title"],
+                    "error": str(result)
+                })
     
-    tasks = [process_movie_with_semaphore(movie) for movie in movies]
-    
-    chunk_size = 10
-    all_results = []
+    if context is not None:
+        await process_all(context)
+    else:
+        async with async_playwright() as p:
+            browser, context = await launch_browser(p)
+            await process_all(context)
+            await context.close()
+            await browser.close()
     
-    for i in range(0, len(tasks), chunk_size):
-        chunk = tasks[i:i + chunk_size]
-        chunk_num = i // chunk_size + 1
-        total_chunks = (len(tasks) + chunk_size - 1) // chunk_size
-        
-        logger.info(f"[BATCH] Processing chunk {chunk_num}/{total_chunks} "
-                   f"({len(chunk)} movies)")
-        
-        try:
-            chunk_results = await asyncio.gather(*chunk, return_exceptions=True)
-            
-            for j, result in enumerate(chunk_results):
-                if isinstance(result, Exception):
-                    movie = movies[i + j]
-                    logger.error(f"[BATCH] Gather error for '{movie['title']}': {result}")
-                    all_results.append({
-                        "url": movie["url"],
-                        "title": movie["title"],
-                        "error": str(result)
-                    })
-                elif result:
-                    all_results.append(result)
-        
-        except Exception as e:
-            logger.error(f"[BATCH] Chunk processing error: {e}")
-        
-        if i + chunk_size < len(tasks):
-            await asyncio.sleep(1)
+    save_scrape_cache(new_cache_entries)
     
-    successful = len([r for r in all_results if r.get('tomatometer_score') is not None])
+    successful = filled_counts['tomatometer_score']
     logger.info(f"[BATCH] Completed. Success rate: {successful}/{len(movies)} "
-               f"({(successful/len(movies)*100 if len(movies) > 0 else 0):.1f}%)")
+               f"({(successful/len(movies)*100 if len(movies) > 0 else 0):.1f}%), "
+               f"cache hits: {cache_hits}")
     
-    return all_results
+    return filled_counts
+
+
+def scrape_metadata_via_worker(movies: List[Dict], writer: csv.DictWriter) -> Tuple[List[Dict], Dict[str, int]]:
+    filled_counts = {col: 0 for col in MOVIE_COLUMNS}
+    done_urls = set()
+    error_rows = []
+    
+    def write_row(row):
+        writer.writerow(row)
+        done_urls.add(row["url"])
+        for col in MOVIE_COLUMNS:
+            if row.get(col) is not None:
+                filled_counts[col] += 1
+    
+    try:
+        for row in stream_worker("scrape_metadata", {"movies": movies}):
+            if row.get("error"):
+                error_rows.append(row)
+            else:
+                write_row(row)
+    except Exception as e:
+        remaining = [movie for movie in movies if movie["url"] not in done_urls]
+        logger.warning(f"[TASK 2] Playwright worker failed, scraping {len(remaining)} "
+                       f"remaining movies in-process: {e}")
+        return remaining, filled_counts
+    
+    for row in error_rows:
+        write_row(row)
+    
+    return [], filled_counts
 
 
 def task_scrape_movies():
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+    
     logger.info("[TASK 1] Starting movie list scraping")
     
-    movies = asyncio.run(scrape_list_pages())
+    movies = None
+    if worker_available():
+        logger.info("[TASK 1] Using warm Playwright worker")
+        try:
+            movies = call_worker("scrape_list")
+        except Exception as e:
+            logger.warning(f"[TASK 1] Playwright worker failed, scraping in-process: {e}")
     
-    with open(RAW_OUTPUT, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["title", "url"])
-        writer.writeheader()
-        writer.writerows(movies)
+    if movies is None:
+        movies = uvloop.run(scrape_list_pages())
+    
+    schema = pa.schema([("title", pa.string()), ("url", pa.string())])
+    pcsv.write_csv(pa.Table.from_pylist(movies, schema=schema), RAW_OUTPUT)
     
     logger.info(f"[TASK 1] Saved {len(movies)} unique movies → {RAW_OUTPUT}")
     
@@ -455,24 +729,19 @@ def task_scrape_movies():
         for movie in movies[:3]:
             logger.info(f"  - {movie['title']}")
     
-    return len(movies)
+    return movies
 
 
-def task_clean_movies():
-    import pandas as pd
-    
+def task_clean_movies(ti):
     logger.info("=" * 60)
     logger.info("[TASK 2] Starting metadata extraction for unique movies")
     logger.info("=" * 60)
     
-    try:
-        df_raw = pd.read_csv(RAW_OUTPUT)
-        logger.info(f"[TASK 2] Loaded {len(df_raw)} unique movies from {RAW_OUTPUT}")
-    except Exception as e:
-        logger.error(f"[TASK 2] Error reading raw data: {e}")
-        return pd.DataFrame()
+    movies = ti.xcom_pull(task_ids="scrape_movie_list")
+    if movies is None:
+        raise AirflowException("[TASK 2] No movie list received from scrape_movie_list")
     
-    movies = df_raw.to_dict("records")
+    logger.info(f"[TASK 2] Received {len(movies)} unique movies from scrape_movie_list")
     
     test_mode = False
     if test_mode:
@@ -481,73 +750,63 @@ def task_clean_movies():
     else:
         logger.info(f"[TASK 2] PRODUCTION MODE: Scraping all {len(movies)} unique movies")
     
-    all_metadata = asyncio.run(scrape_all_movies_batch(movies, max_concurrent=3))
-    
-    df_clean = pd.DataFrame(all_metadata)
-    
-    expected_columns = [
-        'title', 'url', 'tomatometer_score', 'audience_score', 
-        'genre', 'rating', 'duration', 'release_date', 'director',
-        'original_language', 'box_office', 'distributor'
-    ]
-    
-    for col in expected_columns:
-        if col not in df_clean.columns:
-            df_clean[col] = None
-    
-    for col in ['tomatometer_score', 'audience_score']:
-        if col in df_clean.columns:
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-    
-    df_clean = df_clean[expected_columns]
-    
-    df_clean.to_csv(CLEAN_OUTPUT, index=False, encoding='utf-8')
+    with open(CLEAN_OUTPUT, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MOVIE_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        
+        remaining = movies
+        filled_counts = {col: 0 for col in MOVIE_COLUMNS}
+        
+        if worker_available():
+            logger.info("[TASK 2] Using warm Playwright worker")
+            remaining, filled_counts = scrape_metadata_via_worker(movies, writer)
+        
+        if remaining:
+            batch_counts = uvloop.run(scrape_all_movies_batch(remaining, writer))
+            for col in MOVIE_COLUMNS:
+                filled_counts[col] += batch_counts[col]
     
-    successful_scores = len(df_clean[df_clean['tomatometer_score'].notna()])
-    successful_audience = len(df_clean[df_clean['audience_score'].notna()])
+    total = len(movies)
     
     logger.info(f"[TASK 2] Extraction complete!")
     logger.info(f"[TASK 2] Results saved to → {CLEAN_OUTPUT}")
     logger.info(f"[TASK 2] Data completeness:")
-    logger.info(f"  - Tomatometer scores: {successful_scores}/{len(df_clean)}")
-    logger.info(f"  - Audience scores: {successful_audience}/{len(df_clean)}")
-    logger.info(f"  - Genres: {df_clean['genre'].notna().sum()}/{len(df_clean)}")
-    logger.info(f"  - Ratings: {df_clean['rating'].notna().sum()}/{len(df_clean)}")
-    logger.info(f"  - Durations: {df_clean['duration'].notna().sum()}/{len(df_clean)}")
+    logger.info(f"  - Tomatometer scores: {filled_counts['tomatometer_score']}/{total}")
+    logger.info(f"  - Audience scores: {filled_counts['audience_score']}/{total}")
+    logger.info(f"  - Genres: {filled_counts['genre']}/{total}")
+    logger.info(f"  - Ratings: {filled_counts['rating']}/{total}")
+    logger.info(f"  - Durations: {filled_counts['duration']}/{total}")
     
-    if not df_clean.empty:
-        logger.info("[TASK 2] Sample of scraped data:")
-        sample = df_clean.head(5)
-        for _, row in sample.iterrows():
-            logger.info(f"  {row['title'][:40]:40} "
-                       f"T:{row['tomatometer_score']:3} "
-                       f"A:{row['audience_score']:3} "
-                       f"Genre: {row['genre'][:20] if pd.notna(row['genre']) else 'N/A'}")
-    
-    return df_clean
+    return total
 
 
 def task_load_to_sqlite():
-    import pandas as pd
-    
     logger.info("[TASK 3] Loading cleaned data to SQLite")
     
     try:
-        df = pd.read_csv(CLEAN_OUTPUT)
-        logger.info(f"[TASK 3] Read {len(df)} rows from {CLEAN_OUTPUT}")
+        with open(CLEAN_OUTPUT, encoding="utf-8", newline="") as f:
+            rows = [tuple(row.get(col) or None for col in MOVIE_COLUMNS) for row in csv.DictReader(f)]
+        logger.info(f"[TASK 3] Read {len(rows)} rows from {CLEAN_OUTPUT}")
         
         conn = sqlite3.connect(DB_PATH)
+        conn.executescript(SQLITE_PRAGMAS)
         
-        df.to_sql("movies", conn, if_exists="replace", index=False)
+        placeholders = ", ".join(
+            "CAST(NULLIF(?, '') AS INTEGER)" if col in MOVIE_INTEGER_COLUMNS else "?"
+            for col in MOVIE_COLUMNS
+        )
+        insert_sql = f"INSERT INTO movies ({', '.join(MOVIE_COLUMNS)}) VALUES ({placeholders})"
+        
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS movies")
+            conn.execute(CREATE_MOVIES_TABLE)
+            conn.executemany(insert_sql, rows)
         
         with conn:
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_tomatometer ON movies(tomatometer_score)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_audience ON movies(audience_score)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_genre ON movies(genre)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_rating ON movies(rating)")
+            for index_sql in MOVIE_INDEXES:
+                conn.execute(index_sql)
         
-        result = pd.read_sql_query("SELECT COUNT(*) as count FROM movies", conn)
-        loaded_count = result['count'].iloc[0]
+        loaded_count = conn.execute("SELECT COUNT(*) FROM movies").fetchone()[0]
         
         logger.info(f"[TASK 3] Successfully loaded {loaded_count} movies into SQLite")
  
@@ -573,6 +832,11 @@ with DAG(
     tags=["movies", "rottentomatoes", "scores", "metadata"],
 ) as dag:
 
+    t0 = BashOperator(
+        task_id="start_playwright_worker",
+        bash_command=f"python {WORKER_SCRIPT} --ensure",
+    )
+
     t1 = PythonOperator(
         task_id="scrape_movie_list",
         python_callable=task_scrape_movies,
@@ -589,4 +853,4 @@ with DAG(
         python_callable=task_load_to_sqlite,
     )
 
-    t1 >> t2 >> t3
\ No newline at end of file
+    t0 >> t1 >> t2 >> t3
\ No newline at end of file
@@ -1,6 +1,6 @@
 CREATE TABLE IF NOT EXISTS movies (
     title TEXT NOT NULL,
-    url TEXT UNIQUE NOT NULL,
+    url TEXT NOT NULL,
     tomatometer_score INTEGER CHECK(tomatometer_score BETWEEN 0 AND 100),
     audience_score INTEGER CHECK(audience_score BETWEEN 0 AND 100),
     genre TEXT,
@@ -13,7 +13,16 @@ CREATE TABLE IF NOT EXISTS movies (
     distributor TEXT
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_url ON movies(url);
 CREATE INDEX IF NOT EXISTS idx_tomatometer ON movies(tomatometer_score);
 CREATE INDEX IF NOT EXISTS idx_audience ON movies(audience_score);
 CREATE INDEX IF NOT EXISTS idx_genre ON movies(genre);
-CREATE INDEX IF NOT EXISTS idx_rating ON movies(rating);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_rating ON movies(rating);
+
+CREATE TABLE IF NOT EXISTS scrape_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    scraped_at TEXT NOT NULL,
+    payload_json TEXT NOT NULL
+);
\ No newline at end of file